@@ -3,62 +3,165 @@ import hashlib
 import multiprocessing
 import os
 import sys
-import json
+import struct
 
+from md5_kernel import NUMBA_AVAILABLE, md5_range
+from protocol import (MESSAGE_FORMAT, NO_DIGEST, TYPE_REGISTER, TYPE_REQUEST_WORK, TYPE_WORK, TYPE_FOUND,
+                      TYPE_STOP, TYPE_NO_WORK)
 
-def worker(start, end, target_hash, result_queue):
+try:
+    # CPython's built-in MD5 skips the OpenSSL EVP setup that hashlib.md5 goes through on every call
+    from _md5 import md5 as md5_new
+except ImportError:
+    md5_new = hashlib.md5
+
+
+# Constants
+STOP_CHECK_INTERVAL = 1 << 14  # Candidates hashed between two checks of the stop event
+WORKER_CHECK_SECONDS = 1.0  # Time between two checks that no worker died while a block is running
+
+# Shared state set in every pool process by init_worker
+worker_stop_event = None  # Set by the main process once the number has been found
+worker_done_event = None  # Set by the worker that finds the number, to wake the main process
+worker_found_value = None  # The found number, or -1 while it has not been found
+
+
+def init_worker(stop_event, done_event, found_value, worker_counter):
+    """
+    Pool initializer that stores the shared events and result value in the worker process,
+    and pins the process to its own CPU core.
+
+    Args:
+        stop_event (multiprocessing.Event): Event set once the target number has been found.
+        done_event (multiprocessing.Event): Event a worker sets after storing the found number.
+        found_value (multiprocessing.Value): Shared 64-bit integer receiving the found number.
+        worker_counter (multiprocessing.Value): Shared counter handing out a distinct index to each worker.
+    """
+    global worker_stop_event, worker_done_event, worker_found_value
+    worker_stop_event = stop_event
+    worker_done_event = done_event
+    worker_found_value = found_value
+
+    with worker_counter.get_lock():
+        worker_id = worker_counter.value
+        worker_counter.value += 1
+    pin_to_core(worker_id)
+
+
+def pin_to_core(worker_id):
+    """
+    Pins the current process to one of the CPU cores it is allowed to run on, so the OS does not
+    migrate it between cores and its caches stay warm. Does nothing where CPU affinity is not supported.
+
+    Args:
+        worker_id (int): Index of the worker, used to pick the core.
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return
+    try:
+        available_cores = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {available_cores[worker_id % len(available_cores)]})
+    except OSError as e:
+        print(f"Could not pin worker {worker_id} to a core: {e}")
+
+
+def report_found(number):
+    """
+    Publishes the found number to the main process and wakes it up.
+
+    Args:
+        number (int): The number whose hash matches the target.
+    """
+    with worker_found_value.get_lock():
+        worker_found_value.value = number
+    worker_done_event.set()
+
+
+def worker(sub_range):
     """
     Worker function that searches for the target hash within a given range.
     Computes MD5 hashes of numbers in the specified range and compares them with the target hash.
-    If the target hash is found, puts the corresponding number into the result queue.
+    If the target hash is found, reports the corresponding number through the shared found value.
+    Uses the Numba-compiled kernel when available, and falls back to hashlib otherwise.
+    Checks the stop event every STOP_CHECK_INTERVAL candidates and returns early once another worker
+    has found the number, so at most one batch is wasted per worker after a hit.
 
     Args:
-        start (int): The start of the range to search.
-        end (int): The end of the range to search.
-        target_hash (str): The target MD5 hash to find.
-        result_queue (multiprocessing.Queue): Queue to communicate the found number back to the main process.
+        sub_range (tuple): (start, end, target_lo, target_hi), where start and end bound the range to
+            search and target_lo/target_hi are the first and last 8 bytes of the target digest, each as
+            a little-endian signed 64-bit integer.
     """
+    start, end, target_lo, target_hi = sub_range
+
+    if NUMBA_AVAILABLE:
+        for batch_start in range(start, end + 1, STOP_CHECK_INTERVAL):
+            if worker_stop_event.is_set():
+                return
+            batch_end = min(batch_start + STOP_CHECK_INTERVAL - 1, end)
+            number = md5_range(batch_start, batch_end, target_lo, target_hi)
+            if number >= 0:
+                report_found(number)
+                return
+        return
+
+    # Keep the 10-digit zero-padded candidate in place and increment it with carry,
+    # instead of formatting and encoding a new string for every number
+    buf = bytearray(b"0" * 10)
+    n = start
+    for j in range(9, -1, -1):
+        buf[j] = 0x30 + n % 10
+        n //= 10
+
+    # Comparing raw digest bytes is a single memcmp, cheaper than unpacking every digest into integers
+    target_digest = struct.pack('<qq', target_lo, target_hi)
     for number in range(start, end + 1):
-        num_str = f"{number:010d}"  # Format number as a 10-digit zero-padded string
-        hash_result = hashlib.md5(num_str.encode()).hexdigest().upper()
-        if hash_result == target_hash:
-            result_queue.put(num_str)
+        if number & (STOP_CHECK_INTERVAL - 1) == 0 and worker_stop_event.is_set():
             return
 
+        if md5_new(buf).digest() == target_digest:
+            report_found(number)
+            return
+
+        for j in range(9, -1, -1):
+            buf[j] += 1
+            if buf[j] <= 0x39:
+                break
+            buf[j] = 0x30
+
 
-def send_message(conn, message):
+def send_message(stream, message_type, first=0, second=0, digest=NO_DIGEST):
     """
-    Sends a JSON-encoded message over the socket connection.
+    Sends a fixed-size binary message over the socket's buffered stream.
 
     Args:
-        conn (socket.socket): The socket connection to the server.
-        message (dict): The message to send.
+        stream (io.BufferedRWPair): The buffered stream of the connection to the server.
+        message_type (int): One of the TYPE_* constants.
+        first (int): The first 64-bit field of the message.
+        second (int): The second 64-bit field of the message.
+        digest (bytes): The 16-byte digest field of the message.
     """
     try:
-        message_str = json.dumps(message) + '\n'
-        conn.sendall(message_str.encode())
+        stream.write(MESSAGE_FORMAT.pack(message_type, first, second, digest))
+        stream.flush()
     except Exception as e:
         print(f"Error sending message: {e}")
 
 
-def receive_message(conn):
+def receive_message(stream, frame):
     """
-    Receives a JSON-encoded message from the socket connection.
+    Receives one fixed-size binary message from the socket's buffered stream.
 
     Args:
-        conn (socket.socket): The socket connection to the server.
+        stream (io.BufferedRWPair): The buffered stream of the connection to the server.
+        frame (bytearray): Reusable buffer of MESSAGE_FORMAT.size bytes to read the message into.
 
     Returns:
-        dict: The decoded message, or None if an error occurs.
+        tuple: (message_type, first, second, digest), or None if the connection closed or an error occurs.
     """
     try:
-        data = conn.recv(4096).decode()
-        if not data:
+        if stream.readinto(frame) < MESSAGE_FORMAT.size:
             return None
-        return json.loads(data)
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error: {e}")
-        return None
+        return MESSAGE_FORMAT.unpack(frame)
     except Exception as e:
         print(f"Error receiving message: {e}")
         return None
@@ -67,93 +170,98 @@ def receive_message(conn):
 def process_work(server_host, server_port, cores):
     """
     Main client function that connects to the server, requests work, and processes it.
-    Utilizes multiple CPU cores by spawning worker processes.
+    Utilizes multiple CPU cores through a pool of worker processes created once for all blocks.
 
     Args:
         server_host (str): The server's hostname or IP address.
         server_port (int): The server's port number.
         cores (int): Number of CPU cores to utilize.
     """
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.connect((server_host, server_port))
-        register_message = {'type': 'register', 'cores': cores}
-        send_message(s, register_message)
+    if NUMBA_AVAILABLE:
+        # Compile the kernel (or load it from the on-disk cache) once before the workers need it
+        md5_range(0, -1, 0, 0)
 
-        buffer = ""
-        while True:
-            # Request work from the server
-            request_message = {'type': 'request_work', 'cores': cores}
-            send_message(s, request_message)
+    stop_event = multiprocessing.Event()
+    done_event = multiprocessing.Event()
+    found_value = multiprocessing.Value('q', -1)
+    worker_counter = multiprocessing.Value('i', 0)
+    pool = multiprocessing.Pool(cores, initializer=init_worker,
+                                initargs=(stop_event, done_event, found_value, worker_counter))
+    try:
+        with socket.create_connection((server_host, server_port)) as s, s.makefile('rwb') as stream:
+            send_message(stream, TYPE_REGISTER, cores)
 
-            data = s.recv(4096).decode()
-            if not data:
-                break
+            frame = bytearray(MESSAGE_FORMAT.size)
+            while True:
+                # Request work from the server
+                send_message(stream, TYPE_REQUEST_WORK, cores)
 
-            buffer += data
-            while '\n' in buffer:
-                message_str, buffer = buffer.split('\n', 1)
-                try:
-                    message = json.loads(message_str)
-                except json.JSONDecodeError as e:
-                    print(f"JSON decode error from server: {e}")
-                    continue
+                message = receive_message(stream, frame)
+                if message is None:
+                    break
+                message_type, start, end, target_digest = message
 
-                if message['type'] == 'work':
+                if message_type == TYPE_WORK:
                     # Received a block of work
-                    start = message['start']
-                    end = message['end']
-                    target_hash = message.get('target_hash')
-                    if not target_hash:
-                        print("No target hash received.")
-                        return
-
                     print(f"Received work: {start} - {end}")
 
+                    # Split the target into two integers for the Numba kernel, which takes them as int64
+                    # arguments, so they are unpacked as signed. The hashlib fallback packs them back into bytes.
+                    target_lo, target_hi = struct.unpack('<qq', target_digest)
+
                     total = end - start + 1
                     per_process = total // cores
-                    processes_list = []
-                    result_queue = multiprocessing.Queue()
-
-                    # Start worker processes
+                    sub_ranges = []
                     for i in range(cores):
                         process_start = start + i * per_process
                         process_end = start + (i + 1) * per_process - 1 if i < cores - 1 else end
-                        p = multiprocessing.Process(target=worker,
-                                                    args=(process_start, process_end, target_hash, result_queue))
-                        processes_list.append(p)
-                        p.start()
+                        sub_ranges.append((process_start, process_end, target_lo, target_hi))
+
+                    # Sleep until a worker reports the number or the whole block is done.
+                    # A worker killed mid-task (OOM killer, crash) never completes its task, so neither
+                    # callback fires: wake up regularly to check that none of them died.
+                    done_event.clear()
+                    block_workers = multiprocessing.active_children()
+                    block_result = pool.map_async(worker, sub_ranges, chunksize=1,
+                                                  callback=lambda _: done_event.set(),
+                                                  error_callback=lambda _: done_event.set())
+                    while not done_event.wait(WORKER_CHECK_SECONDS):
+                        if not block_result.ready() and not all(p.is_alive() for p in block_workers):
+                            raise RuntimeError("A worker process died before finishing its work.")
 
                     found_number = None
-                    while True:
-                        try:
-                            # Check if any worker found the number
-                            found_number = result_queue.get_nowait()
-                            break
-                        except multiprocessing.queues.Empty:
-                            # Exit loop if all processes have finished
-                            if all(not p.is_alive() for p in processes_list):
-                                break
-
-                    # Terminate all worker processes
-                    for p in processes_list:
-                        p.terminate()
-
-                    if found_number:
+                    if found_value.value >= 0:
+                        # Tell the other workers to skip the rest of their work
+                        stop_event.set()
+                        found_number = found_value.value
+                    else:
+                        block_result.get()  # Re-raise any error from the workers
+
+                    if found_number is not None:
                         # Notify the server that the number was found
-                        found_message = {'type': 'found', 'number': found_number}
-                        send_message(s, found_message)
-                        print(f"Found the number: {found_number}")
+                        send_message(stream, TYPE_FOUND, found_number)
+                        print(f"Found the number: {found_number:010d}")
                         return
 
-                elif message['type'] == 'stop':
+                elif message_type == TYPE_STOP:
                     # Server instructs to stop processing
                     print("Received stop signal from server.")
                     return
 
-                elif message['type'] == 'no_work':
+                elif message_type == TYPE_NO_WORK:
                     # No more work available from the server
                     print("No more work available. Exiting.")
                     return
+    except BaseException:
+        # Workers killed mid-task (e.g. by Ctrl-C) leave their tasks unfinished forever,
+        # so join() alone would never return: kill the pool instead of waiting for it
+        pool.terminate()
+        raise
+    finally:
+        # Let any worker still running return early, then wait for the pool to shut down
+        stop_event.set()
+        pool.close()
+        pool.join()
 
 
 def get_cpu_cores():
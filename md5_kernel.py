@@ -0,0 +1,259 @@
+import math
+
+try:
+    import numpy as np
+    from numba import njit, uint32
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """
+        Stand-in for numba.njit when Numba is not installed.
+        Returns the function unchanged so this module can still be imported.
+        """
+        def decorator(func):
+            return func
+        return decorator
+
+    uint32 = int
+
+
+# Constants
+MASK32 = 0xFFFFFFFF
+CANDIDATE_LENGTH = 10  # Every candidate is a 10-digit zero-padded number
+LENGTH_BITS = CANDIDATE_LENGTH * 8  # Message length stored in word 14 of the padded block
+LANES = 32  # Candidates hashed side by side, one per 32-bit SIMD lane (four AVX2 registers)
+
+# Initial MD5 state (RFC 1321)
+INIT_A = 0x67452301
+INIT_B = 0xEFCDAB89
+INIT_C = 0x98BADCFE
+INIT_D = 0x10325476
+
+# Per-step additive constants: floor(abs(sin(i + 1)) * 2^32)
+K = tuple(int(abs(math.sin(i + 1)) * 2 ** 32) & MASK32 for i in range(64))
+
+
+@njit(inline='always')
+def _rotl(x, s):
+    """
+    Rotates a 32-bit word left by s bits.
+    """
+    return uint32(uint32(x << uint32(s)) | (x >> uint32(32 - s)))
+
+
+# The MD5 steps. Every intermediate is truncated to uint32 so the compiler keeps
+# the lane loops in 32-bit SIMD registers instead of widening them to 64 bits.
+# F and G are written as selects (d ^ (b & (c ^ d)) rather than (b & c) | (~b & d)):
+# two operations on plain x86, and a single vpternlogd on AVX-512 targets.
+@njit(inline='always')
+def _ff(a, b, c, d, x, s, k):
+    return uint32(_rotl(uint32(a + (d ^ (b & (c ^ d))) + x + uint32(k)), s) + b)
+
+
+@njit(inline='always')
+def _gg(a, b, c, d, x, s, k):
+    return uint32(_rotl(uint32(a + (c ^ (d & (b ^ c))) + x + uint32(k)), s) + b)
+
+
+@njit(inline='always')
+def _hh(a, b, c, d, x, s, k):
+    return uint32(_rotl(uint32(a + (b ^ c ^ d) + x + uint32(k)), s) + b)
+
+
+@njit(inline='always')
+def _ii(a, b, c, d, x, s, k):
+    return uint32(_rotl(uint32(a + (c ^ (b | uint32(~d))) + x + uint32(k)), s) + b)
+
+
+@njit(inline='always')
+def _md5_compress(m, lane):
+    """
+    Runs the 64 MD5 steps over the single padded block of a 10-digit candidate.
+    Only the first three message words hold digits: words 3-13 and 15 are always zero and
+    word 14 is the bit length, so they are passed as constants and the compiler folds them away.
+
+    Args:
+        m (numpy.ndarray): The three digit-bearing message words, shaped (3, lanes), one block per lane.
+        lane (int): The lane whose block to compress.
+
+    Returns:
+        tuple: The four digest words (A, B, C, D).
+    """
+    a, b, c, d = uint32(INIT_A), uint32(INIT_B), uint32(INIT_C), uint32(INIT_D)
+
+    # Round 1
+    a = _ff(a, b, c, d, m[0, lane], 7, K[0])
+    d = _ff(d, a, b, c, m[1, lane], 12, K[1])
+    c = _ff(c, d, a, b, m[2, lane], 17, K[2])
+    b = _ff(b, c, d, a, 0, 22, K[3])
+    a = _ff(a, b, c, d, 0, 7, K[4])
+    d = _ff(d, a, b, c, 0, 12, K[5])
+    c = _ff(c, d, a, b, 0, 17, K[6])
+    b = _ff(b, c, d, a, 0, 22, K[7])
+    a = _ff(a, b, c, d, 0, 7, K[8])
+    d = _ff(d, a, b, c, 0, 12, K[9])
+    c = _ff(c, d, a, b, 0, 17, K[10])
+    b = _ff(b, c, d, a, 0, 22, K[11])
+    a = _ff(a, b, c, d, 0, 7, K[12])
+    d = _ff(d, a, b, c, 0, 12, K[13])
+    c = _ff(c, d, a, b, LENGTH_BITS, 17, K[14])
+    b = _ff(b, c, d, a, 0, 22, K[15])
+
+    # Round 2
+    a = _gg(a, b, c, d, m[1, lane], 5, K[16])
+    d = _gg(d, a, b, c, 0, 9, K[17])
+    c = _gg(c, d, a, b, 0, 14, K[18])
+    b = _gg(b, c, d, a, m[0, lane], 20, K[19])
+    a = _gg(a, b, c, d, 0, 5, K[20])
+    d = _gg(d, a, b, c, 0, 9, K[21])
+    c = _gg(c, d, a, b, 0, 14, K[22])
+    b = _gg(b, c, d, a, 0, 20, K[23])
+    a = _gg(a, b, c, d, 0, 5, K[24])
+    d = _gg(d, a, b, c, LENGTH_BITS, 9, K[25])
+    c = _gg(c, d, a, b, 0, 14, K[26])
+    b = _gg(b, c, d, a, 0, 20, K[27])
+    a = _gg(a, b, c, d, 0, 5, K[28])
+    d = _gg(d, a, b, c, m[2, lane], 9, K[29])
+    c = _gg(c, d, a, b, 0, 14, K[30])
+    b = _gg(b, c, d, a, 0, 20, K[31])
+
+    # Round 3
+    a = _hh(a, b, c, d, 0, 4, K[32])
+    d = _hh(d, a, b, c, 0, 11, K[33])
+    c = _hh(c, d, a, b, 0, 16, K[34])
+    b = _hh(b, c, d, a, LENGTH_BITS, 23, K[35])
+    a = _hh(a, b, c, d, m[1, lane], 4, K[36])
+    d = _hh(d, a, b, c, 0, 11, K[37])
+    c = _hh(c, d, a, b, 0, 16, K[38])
+    b = _hh(b, c, d, a, 0, 23, K[39])
+    a = _hh(a, b, c, d, 0, 4, K[40])
+    d = _hh(d, a, b, c, m[0, lane], 11, K[41])
+    c = _hh(c, d, a, b, 0, 16, K[42])
+    b = _hh(b, c, d, a, 0, 23, K[43])
+    a = _hh(a, b, c, d, 0, 4, K[44])
+    d = _hh(d, a, b, c, 0, 11, K[45])
+    c = _hh(c, d, a, b, 0, 16, K[46])
+    b = _hh(b, c, d, a, m[2, lane], 23, K[47])
+
+    # Round 4
+    a = _ii(a, b, c, d, m[0, lane], 6, K[48])
+    d = _ii(d, a, b, c, 0, 10, K[49])
+    c = _ii(c, d, a, b, LENGTH_BITS, 15, K[50])
+    b = _ii(b, c, d, a, 0, 21, K[51])
+    a = _ii(a, b, c, d, 0, 6, K[52])
+    d = _ii(d, a, b, c, 0, 10, K[53])
+    c = _ii(c, d, a, b, 0, 15, K[54])
+    b = _ii(b, c, d, a, m[1, lane], 21, K[55])
+    a = _ii(a, b, c, d, 0, 6, K[56])
+    d = _ii(d, a, b, c, 0, 10, K[57])
+    c = _ii(c, d, a, b, 0, 15, K[58])
+    b = _ii(b, c, d, a, 0, 21, K[59])
+    a = _ii(a, b, c, d, 0, 6, K[60])
+    d = _ii(d, a, b, c, 0, 10, K[61])
+    c = _ii(c, d, a, b, m[2, lane], 15, K[62])
+    b = _ii(b, c, d, a, 0, 21, K[63])
+
+    return uint32(a + INIT_A), uint32(b + INIT_B), uint32(c + INIT_C), uint32(d + INIT_D)
+
+
+@njit(inline='always')
+def _set_digits(digits, lane, number):
+    """
+    Writes a number into a lane of the ASCII digit counters, zero-padded to 10 digits.
+    """
+    for j in range(CANDIDATE_LENGTH - 1, -1, -1):
+        digits[j, lane] = 0x30 + number % 10
+        number //= 10
+
+
+@njit(inline='always')
+def _increment_digits(digits, lane):
+    """
+    Increments a lane of the ASCII digit counters by one, propagating the carry.
+    """
+    j = CANDIDATE_LENGTH - 1
+    while j >= 0:
+        digits[j, lane] += 1
+        if digits[j, lane] <= 0x39:
+            break
+        digits[j, lane] = 0x30
+        j -= 1
+
+
+@njit(inline='always')
+def _load_digits(m, digits, lane):
+    """
+    Patches the three message words that hold the digits of a lane.
+    """
+    m[0, lane] = digits[0, lane] | (digits[1, lane] << 8) | (digits[2, lane] << 16) | (digits[3, lane] << 24)
+    m[1, lane] = digits[4, lane] | (digits[5, lane] << 8) | (digits[6, lane] << 16) | (digits[7, lane] << 24)
+    m[2, lane] = digits[8, lane] | (digits[9, lane] << 8) | (0x80 << 16)
+
+
+@njit(cache=True, boundscheck=False)
+def md5_range(start, end, target_lo, target_hi):
+    """
+    Searches the range [start, end] for the 10-digit number whose MD5 digest matches the target.
+    The range is split into LANES streams that are hashed side by side: the lane loop is vectorized by
+    the compiler, so each AVX2 instruction advances 8 candidates at once. The padded blocks
+    are built once; each iteration only patches the words holding the digits, which are kept as
+    ASCII counters and incremented with carry instead of being reformatted.
+
+    Args:
+        start (int): The start of the range to search.
+        end (int): The end of the range to search.
+        target_lo (int): The first 8 bytes of the target digest, as a little-endian signed 64-bit integer.
+        target_hi (int): The last 8 bytes of the target digest, as a little-endian signed 64-bit integer.
+
+    Returns:
+        int: The matching number, or -1 if it is not in the range.
+    """
+    count = end - start + 1
+    if count <= 0:
+        return -1
+    per_lane = count // LANES
+
+    # Split the target into the four state words once, outside the hashing loop
+    target_a = uint32(target_lo & MASK32)
+    target_b = uint32((target_lo >> 32) & MASK32)
+    target_c = uint32(target_hi & MASK32)
+    target_d = uint32((target_hi >> 32) & MASK32)
+
+    # Digit-bearing words of the padded blocks: the 10 digit bytes and the 0x80 terminator at byte 10
+    m = np.zeros((3, LANES), np.uint32)
+    digits = np.empty((CANDIDATE_LENGTH, LANES), np.uint32)
+    digest = np.empty((4, LANES), np.uint32)
+
+    for lane in range(LANES):
+        _set_digits(digits, lane, start + lane * per_lane)
+
+    for i in range(per_lane):
+        for lane in range(LANES):
+            _load_digits(m, digits, lane)
+        for lane in range(LANES):
+            a, b, c, d = _md5_compress(m, lane)
+            digest[0, lane] = a
+            digest[1, lane] = b
+            digest[2, lane] = c
+            digest[3, lane] = d
+
+        for lane in range(LANES):
+            if (digest[0, lane] == target_a and digest[1, lane] == target_b
+                    and digest[2, lane] == target_c and digest[3, lane] == target_d):
+                return start + lane * per_lane + i
+
+        for lane in range(LANES):
+            _increment_digits(digits, lane)
+
+    # Hash the remainder that does not fill all the lanes one at a time in lane 0
+    _set_digits(digits, 0, start + LANES * per_lane)
+    for number in range(start + LANES * per_lane, end + 1):
+        _load_digits(m, digits, 0)
+        a, b, c, d = _md5_compress(m, 0)
+        if a == target_a and b == target_b and c == target_c and d == target_d:
+            return number
+        _increment_digits(digits, 0)
+
+    return -1
@@ -0,0 +1,14 @@
+import struct
+
+
+# Protocol: every message is a fixed-size frame of type, two 64-bit fields and the raw 16-byte digest.
+# register/request_work carry the core count in the first field, work carries start/end and the
+# target digest, found carries the number in the first field.
+MESSAGE_FORMAT = struct.Struct('<BQQ16s')
+NO_DIGEST = bytes(16)
+TYPE_REGISTER = 1
+TYPE_REQUEST_WORK = 2
+TYPE_WORK = 3
+TYPE_FOUND = 4
+TYPE_STOP = 5
+TYPE_NO_WORK = 6
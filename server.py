@@ -1,164 +1,206 @@
-import socket
-import json
-import threading
+import asyncio
+import collections
+import time
+
+from protocol import (MESSAGE_FORMAT, NO_DIGEST, TYPE_REGISTER, TYPE_REQUEST_WORK, TYPE_WORK, TYPE_FOUND,
+                      TYPE_STOP, TYPE_NO_WORK)
 
 
 # Constants
 TARGET_HASH = 'EC9C0F7EDCC18A98B1F31853B1813301'
+TARGET_DIGEST = bytes.fromhex(TARGET_HASH)  # Sent to clients as raw bytes
 START_NUMBER = 0
 END_NUMBER = 1 * 10 ** 10 - 1
-BLOCK_SIZE_PER_CORE = 200000
+BLOCK_SIZE_PER_CORE = 200000  # Size of a client's first block, before its hash rate is known
+MIN_BLOCK_SIZE_PER_CORE = 10000
+TARGET_BLOCK_SECONDS = 0.1  # Blocks are sized so each takes a client about this long
+RATE_SMOOTHING = 0.3  # Weight of the newest measurement in the hash rate moving average
 
 # Global variables
-lock = threading.Lock()
+# All of them are only touched from the event loop thread, and no handler awaits while
+# updating them, so every update below runs without interruption and needs no lock.
 current_number = START_NUMBER
 found = False
 found_number = None
+found_event = None  # asyncio.Event created by serve(); set once the number is found to stop the server
 
 clients = []
 assigned_work = {}
+hash_rates = {}  # Smoothed candidates per second of each client
+pending_work = collections.deque()  # Blocks left unfinished by disconnected clients, reassigned first
 
 
-def register_client(conn, addr, message):
+def register_client(writer, addr, cores):
     """
     Registers a client by storing its connection and core count.
 
     Args:
-        conn (socket.socket): The client's socket connection.
+        writer (asyncio.StreamWriter): The client's stream writer.
         addr (tuple): The client's address.
-        message (dict): The registration message containing core count.
+        cores (int): The core count from the registration message.
     """
-    client_cores = message.get('cores', 1)  # Default to 1 if cores not provided
-    with lock:
-        clients.append({'conn': conn, 'cores': client_cores})
+    client_cores = cores or 1  # Default to 1 if cores not provided
+    clients.append({'writer': writer, 'cores': client_cores})
     print(f"Registered client {addr} with {client_cores} cores.")
     return client_cores
 
 
-def assign_work(conn, client_cores):
+def update_hash_rate(writer, work, now):
     """
-    Assigns a block of work to a client based on its core count.
+    Updates the moving average of a client's hash rate after it finished a block.
 
     Args:
-        conn (socket.socket): The client's socket connection.
+        writer (asyncio.StreamWriter): The client's stream writer.
+        work (dict): The block the client just finished.
+        now (float): The current time.monotonic() value.
+    """
+    elapsed = now - work['assigned_at']
+    if elapsed <= 0:
+        return
+    rate = (work['end'] - work['start'] + 1) / elapsed
+    if writer in hash_rates:
+        rate = (1 - RATE_SMOOTHING) * hash_rates[writer] + RATE_SMOOTHING * rate
+    hash_rates[writer] = rate
+
+
+def get_block_size(writer, client_cores):
+    """
+    Returns the size of the next block for a client, so that it takes about TARGET_BLOCK_SECONDS.
+
+    Args:
+        writer (asyncio.StreamWriter): The client's stream writer.
         client_cores (int): Number of cores available on the client.
 
     Returns:
-        dict: The work details if work is assigned, None otherwise.
+        int: The number of candidates to assign.
     """
-    global current_number
-    with lock:
-        # Remove any previous work assigned to this client
-        if conn in assigned_work:
-            assigned_work.pop(conn)
+    if writer not in hash_rates:
+        return BLOCK_SIZE_PER_CORE * client_cores
+    return max(MIN_BLOCK_SIZE_PER_CORE * client_cores, int(hash_rates[writer] * TARGET_BLOCK_SECONDS))
 
-        if found:
-            # If the target number has already been found, instruct the client to stop
-            send_message(conn, {'type': 'stop'})
-            return None
 
-        block_size = BLOCK_SIZE_PER_CORE * client_cores
-        start = current_number
-        end = min(current_number + block_size - 1, END_NUMBER)
+def assign_work(writer, client_cores):
+    """
+    Assigns a block of work to a client based on its core count and measured hash rate.
 
-        if start > END_NUMBER:
-            # No more work to assign
-            send_message(conn, {'type': 'no_work'})
-            return None
+    Args:
+        writer (asyncio.StreamWriter): The client's stream writer.
+        client_cores (int): Number of cores available on the client.
 
+    Returns:
+        dict: The work details if work is assigned, None otherwise.
+    """
+    global current_number
+    # Remove any previous work assigned to this client, and learn its hash rate from how long it took
+    now = time.monotonic()
+    previous_work = assigned_work.pop(writer, None)
+    if previous_work is not None:
+        update_hash_rate(writer, previous_work, now)
+
+    if found:
+        # If the target number has already been found, instruct the client to stop
+        send_message(writer, TYPE_STOP)
+        return None
+
+    if pending_work:
+        # Hand out blocks orphaned by disconnected clients before advancing into new numbers
+        work = pending_work.popleft()
+        work['assigned_at'] = now
+    elif current_number > END_NUMBER:
+        # No more work to assign
+        send_message(writer, TYPE_NO_WORK)
+        return None
+    else:
+        block_size = get_block_size(writer, client_cores)
+        start = current_number
+        end = min(current_number + block_size - 1, END_NUMBER)
         current_number = end + 1
-        work = {'start': start, 'end': end}
-        assigned_work[conn] = work
+        work = {'start': start, 'end': end, 'assigned_at': now}
+    assigned_work[writer] = work
 
     # Send the assigned work to the client
-    work_message = {
-        'type': 'work',
-        'start': work['start'],
-        'end': work['end'],
-        'target_hash': TARGET_HASH
-    }
-    send_message(conn, work_message)
+    send_message(writer, TYPE_WORK, work['start'], work['end'], TARGET_DIGEST)
     return work
 
 
-def handle_found(conn, message):
+def handle_found(writer, number):
     """
     Handles the case when a client reports finding the target number.
 
     Args:
-        conn (socket.socket): The client's socket connection.
-        message (dict): The message containing the found number.
+        writer (asyncio.StreamWriter): The client's stream writer.
+        number (int): The number reported by the client.
     """
     global found, found_number
-    with lock:
-        if conn in assigned_work:
-            assigned_work.pop(conn)
+    if writer in assigned_work:
+        assigned_work.pop(writer)
 
-        if not found:
-            found = True
-            found_number = message['number']
-            print(f"Found number: {found_number}")
+    if not found:
+        found = True
+        found_number = number
+        print(f"Found number: {found_number:010d}")
+        found_event.set()
 
     # Notify all clients to stop processing
     notify_all_clients()
 
 
-def handle_client(conn, addr):
+async def handle_client(reader, writer):
     """
     Handles communication with a connected client.
 
     Args:
-        conn (socket.socket): The socket connection to the client.
-        addr (tuple): The address of the client.
+        reader (asyncio.StreamReader): The stream reader of the client connection.
+        writer (asyncio.StreamWriter): The stream writer of the client connection.
     """
-    global current_number, found
+    addr = writer.get_extra_info('peername')
     print(f"Client {addr} connected.")
-    buffer = ""
     client_cores = 1  # Default to 1 core if not specified
     try:
         while True:
-            data = conn.recv(1024).decode()
-            if not data:
+            try:
+                frame = await reader.readexactly(MESSAGE_FORMAT.size)
+            except asyncio.IncompleteReadError:
                 break  # Client disconnected
+            message_type, first, _, _ = MESSAGE_FORMAT.unpack(frame)
 
-            buffer += data
-            while '\n' in buffer:
-                message_str, buffer = buffer.split('\n', 1)
-                try:
-                    message = json.loads(message_str)
-                except json.JSONDecodeError as e:
-                    print(f"JSON decode error from {addr}: {e}")
-                    continue
+            if message_type == TYPE_REGISTER:
+                client_cores = register_client(writer, addr, first)
 
-                if message['type'] == 'register':
-                    client_cores = register_client(conn, addr, message)
+            elif message_type == TYPE_REQUEST_WORK:
+                assign_work(writer, client_cores)
 
-                elif message['type'] == 'request_work':
-                    assign_work(conn, client_cores)
+            elif message_type == TYPE_FOUND:
+                handle_found(writer, first)
 
-                elif message['type'] == 'found':
-                    handle_found(conn, message)
+            else:
+                print(f"Unknown message type {message_type} from {addr}")
 
+            # Wait for the reply to be flushed if the client is slow to read
+            await writer.drain()
+
+    except asyncio.CancelledError:
+        pass  # The server is shutting down after the number was found
     except Exception as e:
         print(f"Error with client {addr}: {e}")
     finally:
-        cleanup_client(conn, addr)
+        cleanup_client(writer, addr)
 
 
-def cleanup_client(conn, addr):
+def cleanup_client(writer, addr):
     """
     Cleans up resources when a client disconnects.
 
     Args:
-        conn (socket.socket): The client's socket connection.
+        writer (asyncio.StreamWriter): The client's stream writer.
         addr (tuple): The client's address.
     """
-    with lock:
-        if conn in assigned_work:
-            work = assigned_work.pop(conn)
-            # Reassign the start number to avoid lost work
-        clients[:] = [c for c in clients if c['conn'] != conn]
-    conn.close()
+    if writer in assigned_work:
+        # Queue the unfinished block for another client so its numbers are not skipped
+        pending_work.append(assigned_work.pop(writer))
+    hash_rates.pop(writer, None)
+    clients[:] = [c for c in clients if c['writer'] != writer]
+    writer.close()
     print(f"Client {addr} disconnected.")
 
 
@@ -166,58 +208,62 @@ def notify_all_clients():
     """
     Notifies all connected clients to stop processing.
     """
-    with lock:
-        for client in clients:
-            try:
-                send_message(client['conn'], {'type': 'stop'})
-            except Exception as e:
-                print(f"Error notifying client: {e}")
+    for client in clients:
+        try:
+            send_message(client['writer'], TYPE_STOP)
+        except Exception as e:
+            print(f"Error notifying client: {e}")
 
 
-def send_message(conn, message):
+def send_message(writer, message_type, first=0, second=0, digest=NO_DIGEST):
     """
-    Sends a JSON message to a client over the socket connection.
+    Queues a fixed-size binary message to a client on its stream writer.
 
     Args:
-        conn (socket.socket): The socket connection to the client.
-        message (dict): The message to send.
+        writer (asyncio.StreamWriter): The client's stream writer.
+        message_type (int): One of the TYPE_* constants.
+        first (int): The first 64-bit field of the message.
+        second (int): The second 64-bit field of the message.
+        digest (bytes): The 16-byte digest field of the message.
     """
     try:
-        message_str = json.dumps(message) + '\n'
-        conn.sendall(message_str.encode())
+        writer.write(MESSAGE_FORMAT.pack(message_type, first, second, digest))
     except Exception as e:
         print(f"Error sending message: {e}")
 
 
-def server_main(host='0.0.0.0', port=5000):
+async def serve(host, port):
     """
-    Main server function that accepts client connections and starts client handler threads.
+    Accepts client connections and serves all of them from a single event loop until the number is found.
 
     Args:
         host (str): The host IP address to bind the server socket to.
         port (int): The port number to bind the server socket to.
     """
-    global found
-    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server.bind((host, port))
-    server.listen()
-    server.settimeout(1.0)
+    global found_event
+    found_event = asyncio.Event()
+    server = await asyncio.start_server(handle_client, host, port)
     print(f"Server listening on {host}:{port}")
+    async with server:
+        # Sleep until handle_found reports the number, without waking up in between
+        await found_event.wait()
+
 
+def server_main(host='0.0.0.0', port=5000):
+    """
+    Main server function that runs the asyncio server handling all clients.
+
+    Args:
+        host (str): The host IP address to bind the server socket to.
+        port (int): The port number to bind the server socket to.
+    """
     try:
-        while not found:
-            try:
-                conn, addr = server.accept()
-                client_thread = threading.Thread(target=handle_client, args=(conn, addr), daemon=True)
-                client_thread.start()
-            except socket.timeout:
-                continue
+        asyncio.run(serve(host, port))
     except KeyboardInterrupt:
         print("Server shutting down due to KeyboardInterrupt.")
     finally:
-        server.close()
         if found:
-            print(f"Number {found_number} found. Shutting down server.")
+            print(f"Number {found_number:010d} found. Shutting down server.")
         else:
             print("Server shutting down.")
 
@@ -0,0 +1,76 @@
+import hashlib
+import struct
+import unittest
+
+from md5_kernel import LANES, NUMBA_AVAILABLE, md5_range
+
+
+# Constants
+LAST_NUMBER = 9999999999
+
+
+def target_halves(number):
+    """
+    Returns the target digest of a number in the form md5_range takes it.
+
+    Args:
+        number (int): The number to hash, zero-padded to 10 digits.
+
+    Returns:
+        tuple: (target_lo, target_hi), the digest halves as little-endian signed 64-bit integers.
+    """
+    return struct.unpack('<qq', hashlib.md5(f"{number:010d}".encode()).digest())
+
+
+@unittest.skipUnless(NUMBA_AVAILABLE, "Numba is not installed")
+class Md5RangeTest(unittest.TestCase):
+    """
+    Checks md5_range against hashlib by planting the target at every position of a range:
+    the first and last candidates, lane boundaries and the scalar remainder.
+    """
+
+    def assert_finds_every_number(self, start, end):
+        for number in range(start, end + 1):
+            target_lo, target_hi = target_halves(number)
+            self.assertEqual(md5_range(start, end, target_lo, target_hi), number)
+
+    def assert_finds_positions(self, start, end, positions):
+        for number in positions:
+            target_lo, target_hi = target_halves(number)
+            self.assertEqual(md5_range(start, end, target_lo, target_hi), number)
+
+    def test_range_sizes(self):
+        for size in (1, LANES - 1, LANES, LANES + 1):
+            with self.subTest(size=size):
+                self.assert_finds_every_number(1234567, 1234567 + size - 1)
+
+    def test_stop_check_batch(self):
+        start = 5000000000
+        end = start + 16384 - 1
+        # Every candidate of lanes 0, 1 and the last lane, plus the boundaries of all the others
+        per_lane = 16384 // LANES
+        positions = set(range(start, start + 2 * per_lane))
+        positions.update(range(end - per_lane + 1, end + 1))
+        for lane in range(LANES):
+            positions.update((start + lane * per_lane, start + (lane + 1) * per_lane - 1))
+        self.assert_finds_positions(start, end, sorted(positions))
+
+    def test_carry_into_high_digits(self):
+        # Each lane crosses a ...99 -> ...00 carry, several of which ripple into digits 0-7
+        for start in (99999950, 199999990 - 10 * LANES, 999999999 - 40 * LANES):
+            with self.subTest(start=start):
+                self.assert_finds_every_number(start, start + 100 * LANES + 7)
+
+    def test_range_ending_at_last_number(self):
+        for size in (1, LANES + 5, 1000):
+            with self.subTest(size=size):
+                self.assert_finds_every_number(LAST_NUMBER - size + 1, LAST_NUMBER)
+
+    def test_missing_target(self):
+        target_lo, target_hi = target_halves(42)
+        self.assertEqual(md5_range(43, 43 + 10 * LANES, target_lo, target_hi), -1)
+        self.assertEqual(md5_range(10, 9, target_lo, target_hi), -1)
+
+
+if __name__ == "__main__":
+    unittest.main()